@@ -16,6 +16,7 @@ def ADT(name='ADT'):
                 def __str__(self):
                     return '%s(%s)' % (self.__class__.__name__, ', '.join(str(x) for x in self.args))
             _ADTInst.__name__ = name
+            _ADTInst.fields = targs
             self.insts.append(_ADTInst(*(x.__name__ for x in targs)))
             return _ADTInst
         def __str__(self):
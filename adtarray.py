@@ -0,0 +1,169 @@
+import numpy as np
+from adt import ADTException
+from pypat import PatternException, PureMatchable, Literal, As, Or, Guard, validate
+
+DTYPES = {bool: np.bool_, int: np.int64, float: np.float64, complex: np.complex128}
+
+def column(values, typ):
+    # A field gets a native dtype only if every value has exactly its
+    # declared type, since ADT constructors don't check their
+    # arguments and casting would change what the records match;
+    # other fields (str, other ADTs, mixed values, ...) are stored
+    # as object columns
+    dtype = DTYPES.get(typ, object)
+    if dtype is not object and all(type(v) is typ for v in values):
+        try:
+            return np.array(values, dtype=dtype)
+        except OverflowError:
+            pass
+    col = np.empty(len(values), dtype=object)
+    for i, v in enumerate(values):
+        col[i] = v
+    return col
+
+class ADTArray(object):
+    # Columnar storage for flat instances of an ADT: tags[i] is the
+    # index of record i's constructor in adt.insts, and
+    # columns[tag][j] holds field j of that constructor for every
+    # record (records with a different tag hold a filler value).
+    def __init__(self, adt, tags, columns):
+        self.adt = adt
+        self.ctors = [inst.__class__ for inst in adt.insts]
+        self.tags = tags
+        self.columns = columns
+        if len(columns) != len(self.ctors) or \
+           any(len(cols) != len(ctor.fields) for ctor, cols in zip(self.ctors, columns)):
+            raise ADTException('Incorrect number of columns for ADT %s' % adt.__name__)
+        if any(len(col) != len(tags) for cols in columns for col in cols):
+            raise ADTException('Incorrect number of rows in columns for ADT %s' % adt.__name__)
+
+    @classmethod
+    def from_records(cls, adt, records):
+        records = list(records)
+        ctors = [inst.__class__ for inst in adt.insts]
+        index = {ctor: k for k, ctor in enumerate(ctors)}
+        tags = np.empty(len(records), dtype=np.intp)
+        for i, rec in enumerate(records):
+            try:
+                tags[i] = index[rec.__class__]
+            except KeyError:
+                raise ADTException('%s is not an instance of ADT %s' % (rec, adt.__name__))
+        columns = []
+        for k, ctor in enumerate(ctors):
+            rows = np.nonzero(tags == k)[0]
+            cols = []
+            for j, typ in enumerate(ctor.fields):
+                values = column([records[i].args[j] for i in rows], typ)
+                col = np.zeros(len(records), dtype=values.dtype)
+                col[rows] = values
+                cols.append(col)
+            columns.append(cols)
+        return cls(adt, tags, columns)
+
+    def __len__(self):
+        return len(self.tags)
+    def __getitem__(self, i):
+        tag = self.tags[i]
+        return self.ctors[tag](*(col.item(i) for col in self.columns[tag]))
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+def vmatch(target, *cases):
+    # Vectorized counterpart to match() over an ADTArray. Patterns may
+    # only be '_', literals, constructor types, or constructor
+    # applications whose fields are '_', variables, literals, types,
+    # or As of those; top-level literals and constructors of other
+    # ADTs never match. Top-level variables and As are not supported,
+    # since whole records have no column to bind, and the
+    # alternatives of an Or case must all bind the same variables.
+    # Guards receive the bound columns (restricted to the candidate
+    # rows) as arrays and must return a boolean array.
+    # Returns an array holding the index of the winning case for
+    # each record (-1 if none matches) and, for each case, a dict
+    # mapping its variables to the bound columns of the records it
+    # won, in record order.
+    winners = np.full(len(target), -1, dtype=np.intp)
+    bindings = []
+    for i, (pattern, *rest, action) in enumerate(cases):
+        validate(rest, action)
+        patterns = [pattern] + [p.pattern for p in rest if isinstance(p, Or)]
+        guards = [g.guard for g in rest if isinstance(g, Guard)]
+
+        won = []
+        for pattern in patterns:
+            mask, binds = vcasematch(target, pattern)
+            rows = np.nonzero(mask & (winners == -1))[0]
+            cols = {k: v[rows] for k, v in binds.items()}
+            if guards and len(rows):
+                keep = np.ones(len(rows), dtype=bool)
+                for guard in guards:
+                    keep &= np.asarray(guard(**cols), dtype=bool)
+                rows = rows[keep]
+                cols = {k: v[keep] for k, v in cols.items()}
+            winners[rows] = i
+            won.append((rows, cols))
+        bindings.append(merge_columns(won))
+    return winners, bindings
+
+def merge_columns(won):
+    # Interleave the rows won by each alternative of an Or case
+    if len(won) == 1:
+        return won[0][1]
+    names = set(won[0][1])
+    if any(set(cols) != names for _, cols in won):
+        raise PatternException('Or patterns must bind the same variables')
+    order = np.argsort(np.concatenate([rows for rows, _ in won]), kind='stable')
+    merged = {}
+    for k in names:
+        # Don't let numpy promote (e.g. bool and int) columns to a
+        # common dtype, which would change the bound values
+        parts = [cols[k] for _, cols in won]
+        if len(set(part.dtype for part in parts)) > 1:
+            parts = [part.astype(object) for part in parts]
+        merged[k] = np.concatenate(parts)[order]
+    return merged
+
+def merge_binds(m1, b1, m2, b2):
+    mask = m1 & m2
+    binds = dict(b1)
+    for k in b2:
+        if k in binds:
+            mask = mask & np.asarray(binds[k] == b2[k], dtype=bool)
+        else: binds[k] = b2[k]
+    return mask, binds
+
+def vcasematch(target, pattern):
+    if isinstance(pattern, str) and pattern == '_':
+        return np.ones(len(target), dtype=bool), {}
+    elif isinstance(pattern, type):
+        ks = [k for k, ctor in enumerate(target.ctors) if issubclass(ctor, pattern)]
+        return np.isin(target.tags, ks), {}
+    elif isinstance(pattern, PureMatchable) and pattern.__class__ in target.ctors:
+        k = target.ctors.index(pattern.__class__)
+        mask, binds = target.tags == k, {}
+        for col, typ, fpat in zip(target.columns[k], pattern.__class__.fields,
+                                  pattern.decompose()[1:]):
+            mask, binds = merge_binds(mask, binds, *vfieldmatch(col, typ, fpat))
+        return mask, binds
+    elif isinstance(pattern, (PureMatchable, Literal)):
+        return np.zeros(len(target), dtype=bool), {}
+    raise PatternException('Cannot vectorize pattern %s' % str(pattern))
+
+def vfieldmatch(col, typ, pattern):
+    if isinstance(pattern, str) and pattern == '_':
+        return True, {}
+    elif isinstance(pattern, str):
+        return True, {pattern: col}
+    elif isinstance(pattern, As):
+        return merge_binds(True, {pattern.bind: col}, *vfieldmatch(col, typ, pattern.pattern))
+    elif isinstance(pattern, Literal):
+        return np.asarray(col == pattern.lit, dtype=bool), {}
+    elif isinstance(pattern, type):
+        # Native columns only hold values of exactly their field's type
+        if col.dtype == object:
+            return np.fromiter((isinstance(v, pattern) for v in col),
+                               dtype=bool, count=len(col)), {}
+        return issubclass(typ, pattern), {}
+    elif isinstance(pattern, (PureMatchable, tuple, Or, Guard)):
+        raise PatternException('Cannot vectorize pattern %s' % str(pattern))
+    return np.asarray(col == pattern, dtype=bool), {}
@@ -1,5 +1,8 @@
 from functools import reduce
 import abc
+import mmap as _mmap
+import re as _re
+import struct as _struct
 
 class Matchable:
     @abc.abstractmethod
@@ -49,6 +52,130 @@ class PairList:
 class EmptyList:
     pass
 
+class Struct:
+    # Pattern for a fixed-layout binary record: a struct format and one
+    # pattern per field. Fields are decoded straight out of the target
+    # buffer, and only when their pattern is not '_'.
+    def __init__(self, fmt, *fields):
+        m = _re.fullmatch(r'([@=<>!]?)((?:\s*\d*[xcbB?hHiIlLqQnNefdspP])*)\s*', fmt)
+        if m is None:
+            raise PatternException('Malformed struct format %s' % fmt)
+        order, body = m.groups()
+        self.fmt = fmt
+        self.codecs = []
+        prefix = order
+        try:
+            self.size = _struct.calcsize(fmt)
+            for count, code in _re.findall(r'(\d*)([xcbB?hHiIlLqQnNefdspP])', body):
+                if code in 'sp':
+                    self.codecs.append((_struct.Struct(order + count + code),
+                                        _struct.calcsize(prefix + '0' + code)))
+                elif code != 'x':
+                    for k in range(int(count or 1)):
+                        self.codecs.append((_struct.Struct(order + code),
+                                            _struct.calcsize(prefix + '%d%s' % (k, code))))
+                prefix += count + code
+        except _struct.error:
+            raise PatternException('Malformed struct format %s' % fmt)
+        if len(fields) != len(self.codecs):
+            raise PatternException('Malformed pattern')
+        self.fields = fields
+    def fits(self, target):
+        # Memoryviews are measured in bytes, whatever their item format
+        if isinstance(target, memoryview):
+            return target.c_contiguous and target.nbytes == self.size
+        return isinstance(target, (bytes, bytearray, _mmap.mmap)) and len(target) == self.size
+
+class NilType:
+    __slots__ = ()
+    def __new__(cls):
+        try:
+            return Nil
+        except NameError:
+            return super().__new__(cls)
+    def __iter__(self):
+        return iter(())
+    def __len__(self):
+        return 0
+    def __bool__(self):
+        return False
+    def __add__(self, other):
+        if not isinstance(other, (Cons, NilType)):
+            return NotImplemented
+        return other
+    def __repr__(self):
+        return 'Nil'
+    def __reduce__(self):
+        return (NilType, ())
+Nil = NilType()
+
+class Cons:
+    # Immutable, structure-sharing list node. PairList and EmptyList
+    # match Cons/Nil by following the tail pointer, so destructuring
+    # and rebuilding with Cons(x, xs) are both O(1).
+    __slots__ = ('head', 'tail')
+    def __new__(cls, head, tail=Nil):
+        # Fields are set here rather than in __init__, so a built cell
+        # can't be rewritten by calling __init__ on it again
+        if not isinstance(tail, (Cons, NilType)):
+            raise TypeError('Cons tail must be a Cons or Nil, not %s' % type(tail).__name__)
+        cell = super().__new__(cls)
+        object.__setattr__(cell, 'head', head)
+        object.__setattr__(cell, 'tail', tail)
+        return cell
+    def __setattr__(self, name, value):
+        raise AttributeError('Cons cells are immutable')
+    def __delattr__(self, name):
+        raise AttributeError('Cons cells are immutable')
+    @classmethod
+    def from_iterable(cls, iterable):
+        items = iterable if isinstance(iterable, (list, tuple)) else list(iterable)
+        lst = Nil
+        for item in reversed(items):
+            lst = cls(item, lst)
+        return lst
+    def __iter__(self):
+        node = self
+        while node is not Nil:
+            yield node.head
+            node = node.tail
+    def __len__(self):
+        n = 0
+        node = self
+        while node is not Nil:
+            n += 1
+            node = node.tail
+        return n
+    def __bool__(self):
+        return True
+    def __add__(self, other):
+        # Copies self but shares other
+        if not isinstance(other, (Cons, NilType)):
+            return NotImplemented
+        lst = other
+        for item in reversed(list(self)):
+            lst = Cons(item, lst)
+        return lst
+    def __eq__(self, other):
+        if not isinstance(other, Cons):
+            return NotImplemented
+        a, b = self, other
+        while a is not Nil and b is not Nil:
+            if a is b:
+                return True
+            if a.head != b.head:
+                return False
+            a, b = a.tail, b.tail
+        return a is b
+    __hash__ = None
+    def __repr__(self):
+        return 'clist([%s])' % ', '.join(repr(x) for x in self)
+    def __reduce__(self):
+        return (clist, (list(self),))
+
+def clist(iterable=()):
+    return Cons.from_iterable(iterable)
+
 def match(target, *cases, name=None):
     for pattern, *rest, action in cases:
         validate(rest, action)
@@ -63,6 +190,28 @@ def match(target, *cases, name=None):
     raise PatternException('No pattern matches %s%s' % (str(target), 
                                                         ('' if (name is None) else (' in %s' % name))))
 
+def matchrecords(buffer, size, *cases, name=None):
+    # Matches each consecutive size-byte record of buffer (e.g. an
+    # mmap) in turn, passing memoryview slices rather than copies. The
+    # buffer is only exported while the returned generator is running:
+    # an mmap can't be closed while a partly consumed generator hasn't
+    # been exhausted or close()d, or while any yielded record views
+    # (e.g. bound with As) are still alive.
+    if not isinstance(size, int) or size <= 0:
+        raise PatternException('Record size must be a positive int, not %r' % (size,))
+    with memoryview(buffer) as view:
+        length = view.nbytes
+        if not view.c_contiguous:
+            raise PatternException('Buffer must be contiguous')
+    if length % size:
+        raise PatternException('Buffer length %d is not a multiple of record size %d' %
+                               (length, size))
+    def records():
+        with memoryview(buffer) as view, view.cast('B') as data:
+            for offset in range(0, length, size):
+                yield match(data[offset:offset + size], *cases, name=name)
+    return records()
+
 def validate(rest,action):
     if not (callable(action) and \
             all((isinstance(r, Or) or isinstance(r, Guard)) for r in rest)):
@@ -95,8 +244,20 @@ def casematch(target, pattern):
     elif isinstance(pattern, PairList) and isinstance(target, list) and len(target) > 0:
         return merge_maps(casematch(target[0], pattern.head),
                           casematch(target[1:], pattern.tail))
-    elif isinstance(pattern, EmptyList) and target == []:
+    elif isinstance(pattern, PairList) and isinstance(target, Cons):
+        return merge_maps(casematch(target.head, pattern.head),
+                          casematch(target.tail, pattern.tail))
+    elif isinstance(pattern, EmptyList) and (target is Nil or target == []):
         return {}
+    elif isinstance(pattern, Struct) and pattern.fits(target):
+        maps = {}
+        for field, (codec, offset) in zip(pattern.fields, pattern.codecs):
+            if field == '_':
+                continue
+            maps = merge_maps(maps, casematch(codec.unpack_from(target, offset)[0], field))
+            if maps is False:
+                return False
+        return maps
     elif isinstance(pattern, As):
         return merge_maps(casematch(target, pattern.pattern), {pattern.bind: target})
     elif isinstance(pattern, type) and isinstance(target, pattern):
@@ -31,4 +31,5 @@ setup(
         'Programming Language :: Python :: 3.3',
         'Programming Language :: Python :: 3.4'
     ],
+    extras_require={'numpy': ['numpy']},
     keywords='pattern match adt')
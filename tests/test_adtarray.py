@@ -0,0 +1,121 @@
+import unittest
+from adt import ADT, ADTException
+from pypat import *
+
+try:
+    import numpy as np
+    from adtarray import ADTArray, vmatch
+except ImportError:
+    np = None
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class TestADTArray(unittest.TestCase):
+    def setUp(self):
+        self.event = ADT(name='event')
+        self.Click = self.event(int, int, name='Click')
+        self.Key = self.event(str, bool, name='Key')
+        self.Tick = self.event(float, name='Tick')
+        Click, Key, Tick = self.Click, self.Key, self.Tick
+        self.records = [Click(1, 2), Key('a', True), Tick(0.5), Click(3, 3),
+                        Key('q', False), Tick(2.5), Click(0, 7)]
+
+    def test_roundtrip(self):
+        arr = ADTArray.from_records(self.event, self.records)
+        self.assertEqual(len(arr), 7)
+        self.assertEqual(list(arr.tags), [0, 1, 2, 0, 1, 2, 0])
+        self.assertEqual(arr.columns[0][0].dtype, np.int64)
+        self.assertEqual(arr.columns[1][0].dtype, object)
+        self.assertEqual([str(r) for r in arr], [str(r) for r in self.records])
+
+    def test_vmatch(self):
+        Click, Key, Tick = self.Click, self.Key, self.Tick
+        matcher = Match()
+        matcher.add(Click('x', 'x'), lambda x: 'diagonal')
+        matcher.add(Click(0, '_'), Or(Key(Literal('q'), '_')), lambda: 'edge')
+        matcher.add(Tick('t'), Guard(lambda t: t > 1), lambda t: 'late')
+        matcher.add(Key('k', As('down', bool)), lambda k, down: 'key')
+        arr = ADTArray.from_records(self.event, self.records)
+        winners, binds = vmatch(arr, *matcher.cases)
+
+        self.assertEqual(list(winners), [-1, 3, -1, 0, 1, 2, 1])
+        for rec, i in zip(self.records, winners):
+            if i < 0:
+                self.assertRaises(PatternException, lambda: matcher(rec))
+            else:
+                self.assertEqual(matcher(rec), matcher.cases[i][-1](**{k: None for k in binds[i]}))
+        self.assertEqual(list(binds[0]['x']), [3])
+        self.assertEqual(binds[1], {})
+        self.assertEqual(list(binds[2]['t']), [2.5])
+        self.assertEqual(list(binds[3]['k']), ['a'])
+        self.assertEqual(list(binds[3]['down']), [True])
+
+    def test_vmatch_types(self):
+        arr = ADTArray.from_records(self.event, self.records)
+        winners, binds = vmatch(arr,
+                                (self.Key('_', int), lambda: 'key'),
+                                (self.Click, lambda: 'click'),
+                                ('_', lambda: 'other'))
+        self.assertEqual(list(winners), [1, 0, 2, 1, 0, 2, 1])
+
+    def test_vmatch_agrees_with_match(self):
+        num = ADT(name='num')
+        C = num(int, int, name='C')
+        T = num(float, name='T')
+        X = ADT(name='other')(str, name='X')
+        records = [C(1, 2), C(1.7, 2), T(1), T(1.5), C(2**70, 1), C('x', 1), T(True)]
+        arr = ADTArray.from_records(num, records)
+        self.assertEqual([str(r) for r in arr], [str(r) for r in records])
+        matcher = Match()
+        matcher.add(X('_'), lambda: 'other')
+        matcher.add(T(int), lambda: 'int tick')
+        matcher.add(C(As('a', int), 2), lambda a: 'int c')
+        matcher.add(C(1.7, '_'), lambda: 'float c')
+        matcher.add(T(float), lambda: 'float tick')
+        matcher.add(C('a', 1), lambda a: 'big c')
+        winners, binds = vmatch(arr, *matcher.cases)
+        for rec, i in zip(records, winners):
+            self.assertEqual(matcher(rec), matcher.cases[i][-1](**{k: None for k in binds[i]}))
+        self.assertEqual(list(binds[5]['a']), [2**70, 'x'])
+
+    def test_or_binds_must_agree(self):
+        arr = ADTArray.from_records(self.event, self.records)
+        self.assertRaises(PatternException,
+                          lambda: vmatch(arr, (self.Click('a', '_'), Or(self.Tick('b')),
+                                               lambda **k: k)))
+
+    def test_or_keeps_values(self):
+        val = ADT(name='val')
+        A = val(bool, name='A')
+        B = val(int, name='B')
+        F = val(float, name='F')
+        records = [A(True), B(5), F(2.5), B(1)]
+        arr = ADTArray.from_records(val, records)
+        winners, binds = vmatch(arr, (A('x'), Or(B('x')), Or(F('x')), lambda x: x))
+        self.assertEqual(list(winners), [0, 0, 0, 0])
+        self.assertEqual([(type(x), x) for x in binds[0]['x']],
+                         [(bool, True), (int, 5), (float, 2.5), (int, 1)])
+
+    def test_literal(self):
+        arr = ADTArray.from_records(self.event, self.records)
+        winners, binds = vmatch(arr,
+                                (Literal(self.records[0]), lambda: 'lit'),
+                                ('_', lambda: 'other'))
+        self.assertEqual(list(winners), [1] * 7)
+
+    def test_bad_columns(self):
+        arr = ADTArray.from_records(self.event, self.records)
+        self.assertRaises(ADTException,
+                          lambda: ADTArray(self.event, arr.tags, arr.columns[:1]))
+        self.assertRaises(ADTException,
+                          lambda: ADTArray(self.event, arr.tags[:3], arr.columns))
+
+    def test_unsupported(self):
+        arr = ADTArray.from_records(self.event, self.records)
+        self.assertRaises(PatternException, lambda: vmatch(arr, ('e', lambda e: e)))
+        self.assertRaises(PatternException,
+                          lambda: vmatch(arr, (As('e', self.Click), lambda e: e)))
+        self.assertRaises(PatternException,
+                          lambda: vmatch(arr, (self.Click((1, 2), '_'), lambda: 0)))
+
+if __name__ == '__main__':
+    unittest.main()
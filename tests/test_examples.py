@@ -110,6 +110,51 @@ class TestExamples(unittest.TestCase):
                          (EmptyList(), lambda: []))
         self.assertEqual(mmap((lambda x: x * x), [1,2,3,4]), [1,4,9,16])
 
+    # Binary records in bytes, memoryviews or mmaps can be matched
+    # with Struct, which takes a struct format and one pattern per
+    # field. Only fields whose pattern is not '_' are decoded.
+    def test_struct(self):
+        import struct
+        def classify(rec):
+            return match(rec,
+                         (Struct('<HIi', Literal(3), 'len', As('x', int)), lambda len, x: len + x),
+                         (Struct('<HIi', 'tag', '_', '_'), lambda tag: tag))
+        self.assertEqual(classify(struct.pack('<HIi', 3, 40, 2)), 42)
+        self.assertEqual(classify(memoryview(struct.pack('<HIi', 7, 40, 2))), 7)
+        self.assertRaises(PatternException, lambda: classify(b'\x03\x00'))
+        self.assertRaises(PatternException, lambda: Struct('<HIi', 'tag'))
+        self.assertRaises(PatternException, lambda: Struct('<n', 'a'))
+        self.assertEqual(classify(memoryview(struct.pack('<HIi', 3, 40, 2)).cast('H')), 42)
+        self.assertRaises(PatternException,
+                          lambda: classify(memoryview(struct.pack('<HIi', 3, 40, 2) * 2)[::2]))
+
+    # matchrecords runs a match over every fixed-size record of a
+    # buffer (such as an mmap of a file), without copying the records
+    def test_matchrecords(self):
+        import struct
+        data = bytearray(b''.join(struct.pack('<hB', n, k) for n, k in [(-1, 0), (5, 1), (9, 1)]))
+        result = list(matchrecords(data, 3,
+                                   (Struct('<hB', 'n', 1), lambda n: n),
+                                   ('_', lambda: None)))
+        self.assertEqual(result, [None, 5, 9])
+        self.assertRaises(PatternException, lambda: matchrecords(data, 4, ('_', lambda: 0)))
+        self.assertRaises(PatternException, lambda: matchrecords(data, 0, ('_', lambda: 0)))
+        self.assertRaises(PatternException, lambda: matchrecords(data, -3, ('_', lambda: 0)))
+
+    def test_matchrecords_mmap(self):
+        import mmap, struct, tempfile
+        with tempfile.TemporaryFile() as f:
+            f.write(struct.pack('<hB', 7, 1) * 4)
+            f.flush()
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            unstarted = matchrecords(mm, 3, (Struct('<hB', 'n', '_'), lambda n: n))
+            partial = matchrecords(mm, 3, (Struct('<hB', 'n', '_'), lambda n: n))
+            self.assertEqual(next(partial), 7)
+            partial.close()
+            self.assertEqual(list(matchrecords(mm, 3, (Struct('<hB', 'n', '_'), lambda n: n))),
+                             [7, 7, 7, 7])
+            mm.close()
+
     # You can match based on the runtime type of a matched value by
     # putting types in the patterns.
     def test_types(self):
@@ -136,6 +181,41 @@ class TestExamples(unittest.TestCase):
                         lambda x,r: '%s is in %s' % (x,r)))
         self.assertEqual(result, '2 is in [2, 3]')
 
+    # Python lists are copied every time PairList takes their tail, so
+    # recursive list functions over them are quadratic. Cons lists
+    # (built with Cons(head, tail), ending in Nil, or converted from
+    # any iterable with clist) share structure, so PairList and
+    # EmptyList destructure them, and Cons rebuilds them, in O(1).
+    def test_conslist(self):
+        def mmap(op, lst):
+            return match(lst,
+                         (PairList('x', 'xs'), lambda x, xs: Cons(op(x), mmap(op, xs))),
+                         (EmptyList(), lambda: Nil))
+        result = mmap((lambda x: x * x), clist([1,2,3,4]))
+        self.assertEqual(result, Cons(1, Cons(4, Cons(9, Cons(16)))))
+        self.assertEqual(list(result), [1,4,9,16])
+        self.assertEqual(len(result), 4)
+        self.assertEqual(clist(iter(range(3))) + clist([3]), clist(range(4)))
+        self.assertIs(clist(), Nil)
+        self.assertRaises(TypeError, lambda: Nil + [1, 2])
+        self.assertRaises(TypeError, lambda: Cons(1, [2]))
+        def mutate():
+            result.head = 5
+        self.assertRaises(AttributeError, mutate)
+        result.__init__(5)
+        self.assertEqual(list(result), [1,4,9,16])
+
+    def test_conslist_sharing(self):
+        tail = clist([2,3])
+        lst = Cons(1, tail)
+        result = match(lst,
+                       (PairList(As('x', int), 'xs'), lambda x, xs: xs))
+        self.assertIs(result, tail)
+        self.assertEqual(match(Nil,
+                               (PairList('_', '_'), lambda: False),
+                               (EmptyList(), lambda: True)),
+                         True)
+
     # Objects that do not perform any kind of input checking can be
     # subclassed from PureMatchable and then used as patterns.
     def test_purematch1(self):